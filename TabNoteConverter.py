@@ -16,14 +16,82 @@ Usage:   Right-click → Convert tab note to → Markdown / Rich Text
 
 import sublime
 import sublime_plugin
+import io
 import re
+import string
+import struct
 import sys
+from functools import lru_cache
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    _user32 = ctypes.windll.user32
+    _kernel32 = ctypes.windll.kernel32
+
+    # Critical: set correct return/arg types for 64-bit pointer safety.
+    # Done once at import — this is global state on the DLL handles, so
+    # there is no reason to redo it on every clipboard write.
+    _kernel32.GlobalAlloc.restype = ctypes.c_void_p
+    _kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    _kernel32.GlobalLock.restype = ctypes.c_void_p
+    _kernel32.GlobalLock.argtypes = [ctypes.c_void_p]
+    _kernel32.GlobalUnlock.restype = wintypes.BOOL
+    _kernel32.GlobalUnlock.argtypes = [ctypes.c_void_p]
+    _user32.SetClipboardData.restype = ctypes.c_void_p
+    _user32.SetClipboardData.argtypes = [wintypes.UINT, ctypes.c_void_p]
+
+
+# Precompiled patterns — these run once per line (or per call) in the
+# conversion hot loops, so skip the `re` module's per-call cache lookup.
+_RE_HEADING = re.compile(r'^(#{1,6})\s+(.+)$')
+_RE_BOLD_LINE = re.compile(r'^\*\*(.+)\*\*$')
+_RE_BULLET = re.compile(r'^(\s*)\*\s+(.+)$')
+
+# Escape tables — str.translate does one pass over the string instead of
+# one full scan (and one new string) per .replace() call.
+_HTML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+_HTML_ESCAPE_QUOT = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+# Indentation prefixes, precomputed per depth so the per-bullet loop does a
+# list index instead of a string multiplication + format call. 32 levels is
+# far deeper than any real note; deeper input falls back to computing it.
+_INDENTS = ['  ' * i for i in range(32)]
+_BULLET_PREFIX = [ind + '* ' for ind in _INDENTS]
+
+# Nested-list transition runs, precomputed so closing/opening N levels is
+# one C-level lookup (or multiplication) instead of N loop iterations.
+_LIST_OPENS = ['<ul><li>' * i for i in range(32)]
+_LIST_CLOSES = ['</li></ul>' * i for i in range(32)]
+
+
+def _list_open(levels):
+    if levels < len(_LIST_OPENS):
+        return _LIST_OPENS[levels]
+    return '<ul><li>' * levels
+
+
+def _list_close(levels):
+    if levels < len(_LIST_CLOSES):
+        return _LIST_CLOSES[levels]
+    return '</li></ul>' * levels
+
+
+def _count_tabs(line):
+    """Count leading tabs with a single scan (no intermediate strings)."""
+    i = 0
+    n = len(line)
+    while i < n and line[i] == '\t':
+        i += 1
+    return i
 
 
 # ---------------------------------------------------------------------------
 # Raw → Markdown conversion
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=8)
 def raw_to_markdown(text):
     """Convert raw tab-indented notes into Markdown.
 
@@ -34,35 +102,39 @@ def raw_to_markdown(text):
     """
     lines = text.split('\n')
     result = []
+    # Collapse runs of blank lines as we go (and drop leading ones),
+    # instead of a second full regex pass over the joined output.
+    prev_blank = True
 
     for line in lines:
-        stripped = line.rstrip()
-
-        # Blank line → preserve as separator
-        if not stripped:
-            result.append('')
+        tab_count = _count_tabs(line)
+        content = line[tab_count:].rstrip()
+
+        # Blank line → preserve a single separator
+        if not content:
+            if not prev_blank:
+                result.append('')
+                prev_blank = True
             continue
 
-        # Count leading tabs
-        tab_count = len(line) - len(line.lstrip('\t'))
-        content = stripped.lstrip('\t')
-
         if tab_count == 0:
             # Top-level heading
-            result.append('# {}'.format(content))
+            result.append(f'# {content}')
         elif tab_count == 1:
             # Section header (bold)
-            result.append('')
-            result.append('**{}**'.format(content))
+            if not prev_blank:
+                result.append('')
+            result.append(f'**{content}**')
         else:
             # Bullet points: 2 tabs = *, 3 tabs = "  *", etc.
-            indent = '  ' * (tab_count - 2)
-            result.append('{}* {}'.format(indent, content))
+            depth = tab_count - 2
+            if depth < len(_BULLET_PREFIX):
+                result.append(_BULLET_PREFIX[depth] + content)
+            else:
+                result.append('  ' * depth + '* ' + content)
+        prev_blank = False
 
-    # Collapse multiple consecutive blank lines into one
-    output = '\n'.join(result)
-    output = re.sub(r'\n{3,}', '\n\n', output)
-    return output
+    return '\n'.join(result)
 
 
 # ---------------------------------------------------------------------------
@@ -76,30 +148,41 @@ def raw_to_markdown(text):
 _SLACK_META = '<meta charset="utf-8">'
 _SLACK_DIV_OPEN = '<div class="p-rich_text_section">'
 _SLACK_DIV_CLOSE = '</div>'
-_SLACK_BOLD = '<b data-stringify-type="bold">{}</b>'
 _SLACK_BR = '<br aria-hidden="true">'
 _SLACK_PARA_BREAK = '<span aria-label="&nbsp;" class="c-mrkdwn__br" data-stringify-type="paragraph-break"></span>'
 
 def _slack_ul_open(indent):
     return (
-        '<ul data-stringify-type="unordered-list" data-list-tree="true" '
-        'class="p-rich_text_list p-rich_text_list__bullet '
-        'p-rich_text_list--nested" data-indent="{}" '
-        'data-border="0">'.format(indent)
+        f'<ul data-stringify-type="unordered-list" data-list-tree="true" '
+        f'class="p-rich_text_list p-rich_text_list__bullet '
+        f'p-rich_text_list--nested" data-indent="{indent}" '
+        f'data-border="0">'
     )
 
 def _slack_li_open(indent):
-    return '<li data-stringify-indent="{}" data-stringify-border="0">'.format(indent)
+    return f'<li data-stringify-indent="{indent}" data-stringify-border="0">'
+
+def _slack_bold(content):
+    return f'<b data-stringify-type="bold">{content}</b>'
 
 
 def _slack_escape(text):
     """Escape HTML but NOT quotes — Slack doesn't escape them."""
-    return (text
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;'))
+    return text.translate(_HTML_ESCAPE)
+
+
+_ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
 
 
+def _upper(text):
+    """Uppercase with a cheap translate for ASCII (the common case for
+    notes); only non-ASCII content pays for full Unicode casing."""
+    if text.isascii():
+        return text.translate(_ASCII_UPPER)
+    return text.upper()
+
+
+@lru_cache(maxsize=8)
 def raw_to_slack_html(text):
     """Convert raw tab-indented notes into Slack's internal HTML format.
 
@@ -113,39 +196,42 @@ def raw_to_slack_html(text):
         2+ tabs → Nested <ul><li> with data-indent attributes
     """
     lines = text.split('\n')
-    parts = [_SLACK_META]
+    # A single StringIO buffer grows in place; a list of fragments would
+    # allocate per append and get traversed again by the final join.
+    buf = io.StringIO()
+    write = buf.write
+    write(_SLACK_META)
     list_stack = []  # tracks indent levels of open lists
     div_open = False
 
     def _close_all_lists():
-        nonlocal list_stack
         while list_stack:
-            parts.append('</li></ul>')
+            write('</li></ul>')
             list_stack.pop()
 
     def _ensure_div():
         nonlocal div_open
         if not div_open:
-            parts.append(_SLACK_DIV_OPEN)
+            write(_SLACK_DIV_OPEN)
             div_open = True
 
     def _close_div():
         nonlocal div_open
         if div_open:
-            parts.append(_SLACK_DIV_CLOSE)
+            write(_SLACK_DIV_CLOSE)
             div_open = False
 
     first_heading = True
 
     for line in lines:
-        stripped = line.rstrip()
+        tab_count = _count_tabs(line)
+        content = line[tab_count:].rstrip()
 
-        if not stripped:
+        if not content:
             _close_all_lists()
             continue
 
-        tab_count = len(line) - len(line.lstrip('\t'))
-        content = _slack_escape(stripped.lstrip('\t'))
+        content = _slack_escape(content)
 
         if tab_count <= 1:
             # Header line — close any open lists first
@@ -156,17 +242,17 @@ def raw_to_slack_html(text):
                 if not div_open and not first_heading:
                     # Add paragraph break between sections
                     _ensure_div()
-                    parts.append(_SLACK_PARA_BREAK)
+                    write(_SLACK_PARA_BREAK)
                 else:
                     _ensure_div()
                 first_heading = False
-                parts.append(_SLACK_BOLD.format(content.upper()))
+                write(_slack_bold(_upper(content)))
             else:
                 # Section header → bold
                 _ensure_div()
-                parts.append(_SLACK_PARA_BREAK)
-                parts.append(_SLACK_BOLD.format(content))
-                parts.append(_SLACK_BR)
+                write(_SLACK_PARA_BREAK)
+                write(_slack_bold(content))
+                write(_SLACK_BR)
                 _close_div()
         else:
             # Bullet point
@@ -177,36 +263,36 @@ def raw_to_slack_html(text):
 
             if not list_stack:
                 # Start first list
-                parts.append(_slack_ul_open(depth))
-                parts.append(_slack_li_open(depth) + content)
+                write(_slack_ul_open(depth))
+                write(_slack_li_open(depth) + content)
                 list_stack.append(depth)
             elif depth > list_stack[-1]:
                 # Going deeper — open nested list(s)
                 while depth > list_stack[-1]:
                     next_depth = list_stack[-1] + 1
-                    parts.append(_slack_ul_open(next_depth))
+                    write(_slack_ul_open(next_depth))
                     if next_depth == depth:
-                        parts.append(_slack_li_open(depth) + content)
+                        write(_slack_li_open(depth) + content)
                     else:
-                        parts.append(_slack_li_open(next_depth))
+                        write(_slack_li_open(next_depth))
                     list_stack.append(next_depth)
             elif depth == list_stack[-1]:
                 # Same level
-                parts.append('</li>')
-                parts.append(_slack_li_open(depth) + content)
+                write('</li>')
+                write(_slack_li_open(depth) + content)
             else:
                 # Going shallower
                 while list_stack and list_stack[-1] > depth:
-                    parts.append('</li></ul>')
+                    write('</li></ul>')
                     list_stack.pop()
-                parts.append('</li>')
-                parts.append(_slack_li_open(depth) + content)
+                write('</li>')
+                write(_slack_li_open(depth) + content)
 
     # Close remaining open elements
     _close_all_lists()
     _close_div()
 
-    return ''.join(parts)
+    return buf.getvalue()
 
 
 #
@@ -217,23 +303,76 @@ def raw_to_slack_html(text):
 
 def _escape_html(text):
     """Escape HTML special characters."""
-    return (text
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;')
-            .replace('"', '&quot;'))
+    return text.translate(_HTML_ESCAPE_QUOT)
 
 
 def _inline_format(text):
-    """Handle inline markdown formatting (bold, italic, inline code)."""
-    escaped = _escape_html(text)
-    # Bold: **text**
-    escaped = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', escaped)
-    # Italic: *text* (but not inside bold)
-    escaped = re.sub(r'(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)', r'<em>\1</em>', escaped)
-    # Inline code: `text`
-    escaped = re.sub(r'`(.+?)`', r'<code>\1</code>', escaped)
-    return escaped
+    """Handle inline markdown formatting (bold, italic, inline code).
+
+    Single left-to-right scan instead of three independent regex passes:
+    str.find locates the closing markers at C speed, and each character
+    is escaped and copied to the output exactly once — there is no
+    up-front escaping pass over the whole string.
+    """
+    out = []
+    append = out.append
+    escape = _HTML_ESCAPE_QUOT
+    i = 0
+    n = len(text)
+
+    while i < n:
+        c = text[i]
+
+        if c == '*':
+            if i + 1 < n and text[i + 1] == '*':
+                # Bold: **text**
+                j = text.find('**', i + 2)
+                if j > i + 2:
+                    append('<strong>{}</strong>'.format(text[i + 2:j].translate(escape)))
+                    i = j + 2
+                    continue
+                # No closing ** → literal
+                append('**')
+                i += 2
+                continue
+            # Italic: *text* — the closing star must stand alone
+            j = text.find('*', i + 1)
+            while j != -1 and (text[j - 1] == '*' or (j + 1 < n and text[j + 1] == '*')):
+                j = text.find('*', j + 1)
+            if j > i + 1:
+                append('<em>{}</em>'.format(text[i + 1:j].translate(escape)))
+                i = j + 1
+                continue
+            append('*')
+            i += 1
+            continue
+
+        if c == '`':
+            # Inline code: `text`
+            j = text.find('`', i + 1)
+            if j > i + 1:
+                append('<code>{}</code>'.format(text[i + 1:j].translate(escape)))
+                i = j + 1
+                continue
+            append('`')
+            i += 1
+            continue
+
+        # Plain text — copy the whole run up to the next marker
+        j_star = text.find('*', i + 1)
+        j_tick = text.find('`', i + 1)
+        if j_star == -1:
+            j = j_tick
+        elif j_tick == -1:
+            j = j_star
+        else:
+            j = min(j_star, j_tick)
+        if j == -1:
+            j = n
+        append(text[i:j].translate(escape))
+        i = j
+
+    return ''.join(out)
 
 
 def markdown_to_html(md):
@@ -247,66 +386,134 @@ def markdown_to_html(md):
 
         # Blank line → close any open lists
         if not stripped:
-            for _ in range(current_depth):
-                html_parts.append('</li></ul>')
-            current_depth = 0
+            if current_depth:
+                html_parts.append(_list_close(current_depth))
+                current_depth = 0
             continue
 
         # Heading: # text
-        heading_match = re.match(r'^(#{1,6})\s+(.+)$', stripped)
+        heading_match = _RE_HEADING.match(stripped)
         if heading_match:
-            for _ in range(current_depth):
-                html_parts.append('</li></ul>')
-            current_depth = 0
+            if current_depth:
+                html_parts.append(_list_close(current_depth))
+                current_depth = 0
             level = len(heading_match.group(1))
             content = _inline_format(heading_match.group(2))
-            html_parts.append('<h{0}>{1}</h{0}>'.format(level, content))
+            html_parts.append(f'<h{level}>{content}</h{level}>')
             continue
 
         # Standalone bold line (section header): **text**
-        bold_match = re.match(r'^\*\*(.+)\*\*$', stripped)
+        bold_match = _RE_BOLD_LINE.match(stripped)
         if bold_match:
-            for _ in range(current_depth):
-                html_parts.append('</li></ul>')
-            current_depth = 0
+            if current_depth:
+                html_parts.append(_list_close(current_depth))
+                current_depth = 0
             content = _escape_html(bold_match.group(1))
-            html_parts.append('<p><strong>{}</strong></p>'.format(content))
+            html_parts.append(f'<p><strong>{content}</strong></p>')
             continue
 
         # Bullet point: (spaces)* text
-        bullet_match = re.match(r'^(\s*)\*\s+(.+)$', line)
+        bullet_match = _RE_BULLET.match(line)
         if bullet_match:
             indent_spaces = len(bullet_match.group(1))
             depth = indent_spaces // 2 + 1
             content = _inline_format(bullet_match.group(2))
 
             if depth > current_depth:
-                # Going deeper — open new list levels
-                for _ in range(depth - current_depth):
-                    html_parts.append('<ul><li>')
-                # Attach content to the last opened <li>
-                html_parts[-1] = '<ul><li>{}'.format(content)
+                # Going deeper — open new list levels, content on the last
+                html_parts.append(_list_open(depth - current_depth) + content)
             elif depth == current_depth:
                 # Same level
-                html_parts.append('</li><li>{}'.format(content))
+                html_parts.append(f'</li><li>{content}')
             else:
                 # Going shallower — close deeper levels, then new item
-                for _ in range(current_depth - depth):
-                    html_parts.append('</li></ul>')
-                html_parts.append('</li><li>{}'.format(content))
+                html_parts.append(_list_close(current_depth - depth))
+                html_parts.append(f'</li><li>{content}')
 
             current_depth = depth
             continue
 
         # Fallback: plain paragraph
-        for _ in range(current_depth):
-            html_parts.append('</li></ul>')
-        current_depth = 0
-        html_parts.append('<p>{}</p>'.format(_inline_format(stripped)))
+        if current_depth:
+            html_parts.append(_list_close(current_depth))
+            current_depth = 0
+        html_parts.append(f'<p>{_inline_format(stripped)}</p>')
+
+    # Close any remaining open lists
+    if current_depth:
+        html_parts.append(_list_close(current_depth))
+
+    return '\n'.join(html_parts)
+
+
+# ---------------------------------------------------------------------------
+# Raw → HTML conversion (fused)
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=8)
+def raw_to_html(text):
+    """Convert raw tab-indented notes directly to HTML in a single pass.
+
+    Equivalent to markdown_to_html(raw_to_markdown(text)), but the tab
+    depth already carries all the structure, so there is no need to
+    serialize to Markdown, re-split, and re-parse with regexes.
+
+    Indentation mapping:
+        0 tabs → <h1>
+        1 tab  → <p><strong>
+        2+ tabs → nested <ul><li>, nesting depth = tabs - 1
+    """
+    lines = text.split('\n')
+    html_parts = []
+    current_depth = 0  # 0 = not in a list
+
+    for line in lines:
+        tab_count = _count_tabs(line)
+        content = line[tab_count:].rstrip()
+
+        # Blank line → close any open lists
+        if not content:
+            if current_depth:
+                html_parts.append(_list_close(current_depth))
+                current_depth = 0
+            continue
+
+        if tab_count == 0:
+            # Top-level heading
+            if current_depth:
+                html_parts.append(_list_close(current_depth))
+                current_depth = 0
+            html_parts.append(f'<h1>{_inline_format(content.lstrip())}</h1>')
+            continue
+
+        if tab_count == 1:
+            # Section header (bold)
+            if current_depth:
+                html_parts.append(_list_close(current_depth))
+                current_depth = 0
+            html_parts.append(f'<p><strong>{_escape_html(content)}</strong></p>')
+            continue
+
+        # Bullet point
+        depth = tab_count - 1
+        content = _inline_format(content.lstrip())
+
+        if depth > current_depth:
+            # Going deeper — open new list levels, content on the last
+            html_parts.append(_list_open(depth - current_depth) + content)
+        elif depth == current_depth:
+            # Same level
+            html_parts.append(f'</li><li>{content}')
+        else:
+            # Going shallower — close deeper levels, then new item
+            html_parts.append(_list_close(current_depth - depth))
+            html_parts.append(f'</li><li>{content}')
+
+        current_depth = depth
 
     # Close any remaining open lists
-    for _ in range(current_depth):
-        html_parts.append('</li></ul>')
+    if current_depth:
+        html_parts.append(_list_close(current_depth))
 
     return '\n'.join(html_parts)
 
@@ -315,6 +522,23 @@ def markdown_to_html(md):
 # CF_HTML payload builder
 # ---------------------------------------------------------------------------
 
+_CF_HTML_HEADER = (
+    "Version:0.9\r\n"
+    "StartHTML:{:010d}\r\n"
+    "EndHTML:{:010d}\r\n"
+    "StartFragment:{:010d}\r\n"
+    "EndFragment:{:010d}\r\n"
+)
+_CF_HTML_PREFIX = "<html><body>\r\n<!--StartFragment-->"
+_CF_HTML_SUFFIX = "<!--EndFragment-->\r\n</body></html>"
+
+# Header, prefix, and suffix are pure ASCII and the {:010d} fields are
+# fixed-width, so all their byte lengths are constants.
+_CF_HTML_HEADER_LEN = len(_CF_HTML_HEADER.format(0, 0, 0, 0))
+_CF_HTML_PREFIX_LEN = len(_CF_HTML_PREFIX)
+_CF_HTML_SUFFIX_LEN = len(_CF_HTML_SUFFIX)
+
+
 def _build_cf_html(html_fragment):
     """Build a CF_HTML formatted payload for the Windows clipboard.
 
@@ -322,32 +546,26 @@ def _build_cf_html(html_fragment):
     the HTML and fragment boundaries. See:
     https://docs.microsoft.com/en-us/windows/win32/dataxchg/html-clipboard-format
     """
-    header_template = (
-        "Version:0.9\r\n"
-        "StartHTML:{:010d}\r\n"
-        "EndHTML:{:010d}\r\n"
-        "StartFragment:{:010d}\r\n"
-        "EndFragment:{:010d}\r\n"
-    )
-
-    prefix = "<html><body>\r\n<!--StartFragment-->"
-    suffix = "<!--EndFragment-->\r\n</body></html>"
-
-    # Calculate byte offsets (must be byte-level, not char-level)
-    header_len = len(header_template.format(0, 0, 0, 0).encode('utf-8'))
-    start_html = header_len
-    start_fragment = start_html + len(prefix.encode('utf-8'))
+    # Calculate byte offsets (must be byte-level, not char-level —
+    # only the fragment can contain non-ASCII, so only it gets encoded)
+    start_html = _CF_HTML_HEADER_LEN
+    start_fragment = start_html + _CF_HTML_PREFIX_LEN
     end_fragment = start_fragment + len(html_fragment.encode('utf-8'))
-    end_html = end_fragment + len(suffix.encode('utf-8'))
+    end_html = end_fragment + _CF_HTML_SUFFIX_LEN
 
-    header = header_template.format(start_html, end_html, start_fragment, end_fragment)
-    return header + prefix + html_fragment + suffix
+    header = _CF_HTML_HEADER.format(start_html, end_html, start_fragment, end_fragment)
+    return header + _CF_HTML_PREFIX + html_fragment + _CF_HTML_SUFFIX
 
 
 # ---------------------------------------------------------------------------
 # Chromium Web Custom MIME Data Format builder
 # ---------------------------------------------------------------------------
 
+# Compiled once — struct.pack('<I', ...) would re-parse the format string
+# on every length field written.
+_U32 = struct.Struct('<I')
+
+
 def _build_chromium_custom_mime(entries):
     """Build a Chromium Web Custom MIME Data Format binary payload.
 
@@ -368,58 +586,72 @@ def _build_chromium_custom_mime(entries):
     Returns:
         bytes: the complete binary payload
     """
-    import struct
-
-    def _pickle_write_string16(parts, text):
-        """Append a Pickle-serialized UTF-16 string to parts list."""
+    def _pickle_write_string16(buf, text):
+        """Append a Pickle-serialized UTF-16 string to the buffer."""
         encoded = text.encode('utf-16-le')
-        char_count = len(text)
-        parts.append(struct.pack('<I', char_count))
-        parts.append(encoded)
+        buf += _U32.pack(len(text))
+        buf += encoded
         # Pad to 4-byte alignment
         remainder = len(encoded) % 4
         if remainder:
-            parts.append(b'\x00' * (4 - remainder))
+            buf += b'\x00' * (4 - remainder)
 
-    # Build the payload (everything after the header size field)
-    payload_parts = []
-    payload_parts.append(struct.pack('<I', len(entries)))
+    # Build the payload (everything after the header size field) in a
+    # single bytearray — amortized in-place growth instead of a list of
+    # tiny bytes objects joined at the end
+    payload = bytearray(_U32.pack(len(entries)))
 
     for mime_type, content in entries:
-        _pickle_write_string16(payload_parts, mime_type)
-        _pickle_write_string16(payload_parts, content)
-
-    payload = b''.join(payload_parts)
+        _pickle_write_string16(payload, mime_type)
+        _pickle_write_string16(payload, content)
 
     # Prepend the payload size header
-    return struct.pack('<I', len(payload)) + payload
+    return _U32.pack(len(payload)) + bytes(payload)
 
 
 # ---------------------------------------------------------------------------
 # Clipboard: Rich Text (HTML) — Windows via ctypes, with PowerShell fallback
 # ---------------------------------------------------------------------------
 
-def _alloc_clipboard_data(kernel32, data_bytes):
-    """Allocate a moveable global memory block and copy data into it."""
-    import ctypes
+# RegisterClipboardFormatW is idempotent and always returns the same atom,
+# so register each format once and cache the ID — no syscall per copy, and
+# nothing registered while we hold the clipboard open.
+_CF_HTML_ATOM = 0
+_CF_CHROMIUM_ATOM = 0
+
+
+def _clipboard_atoms():
+    """Return the (CF_HTML, Chromium custom MIME) atom IDs, registering
+    them on first use."""
+    global _CF_HTML_ATOM, _CF_CHROMIUM_ATOM
+    if not _CF_HTML_ATOM:
+        _CF_HTML_ATOM = _user32.RegisterClipboardFormatW("HTML Format")
+    if not _CF_CHROMIUM_ATOM:
+        _CF_CHROMIUM_ATOM = _user32.RegisterClipboardFormatW(
+            "Chromium Web Custom MIME Data Format"
+        )
+    return _CF_HTML_ATOM, _CF_CHROMIUM_ATOM
+
 
-    GMEM_MOVEABLE = 0x0002
-    hMem = kernel32.GlobalAlloc(GMEM_MOVEABLE, len(data_bytes) + 2)
+def _alloc_clipboard_data(data_bytes):
+    """Allocate a moveable global memory block and copy data into it."""
+    # GHND = GMEM_MOVEABLE | GMEM_ZEROINIT: the 2 spare bytes come back
+    # already zeroed, so the UTF-16-safe null terminator is free.
+    GHND = 0x0042
+    hMem = _kernel32.GlobalAlloc(GHND, len(data_bytes) + 2)
     if not hMem:
         raise RuntimeError("GlobalAlloc failed")
 
-    pMem = kernel32.GlobalLock(hMem)
+    pMem = _kernel32.GlobalLock(hMem)
     if not pMem:
         raise RuntimeError("GlobalLock failed")
 
     ctypes.memmove(pMem, data_bytes, len(data_bytes))
-    # Null-terminate (2 bytes for UTF-16 safety)
-    ctypes.memset(pMem + len(data_bytes), 0, 2)
-    kernel32.GlobalUnlock(hMem)
+    _kernel32.GlobalUnlock(hMem)
     return hMem
 
 
-def _set_clipboard_html_ctypes(html, plain_text, chromium_custom_data=None):
+def _set_clipboard_html_ctypes(html, plain_text, chromium_data_fn=None):
     """Put CF_HTML, CF_UNICODETEXT, and optionally Chromium custom MIME data
     onto the Windows clipboard in a single session.
 
@@ -428,24 +660,8 @@ def _set_clipboard_html_ctypes(html, plain_text, chromium_custom_data=None):
     - Apps reading CF_UNICODETEXT (Slack) get markdown plain text
     - Apps reading Chromium custom MIME (Slack) get slack/html with nesting
     """
-    import ctypes
-    from ctypes import wintypes
-
-    user32 = ctypes.windll.user32
-    kernel32 = ctypes.windll.kernel32
-
-    # Critical: set correct return/arg types for 64-bit pointer safety.
-    kernel32.GlobalAlloc.restype = ctypes.c_void_p
-    kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
-    kernel32.GlobalLock.restype = ctypes.c_void_p
-    kernel32.GlobalLock.argtypes = [ctypes.c_void_p]
-    kernel32.GlobalUnlock.restype = wintypes.BOOL
-    kernel32.GlobalUnlock.argtypes = [ctypes.c_void_p]
-    user32.SetClipboardData.restype = ctypes.c_void_p
-    user32.SetClipboardData.argtypes = [wintypes.UINT, ctypes.c_void_p]
-
     CF_UNICODETEXT = 13
-    CF_HTML = user32.RegisterClipboardFormatW("HTML Format")
+    CF_HTML, CF_CHROMIUM = _clipboard_atoms()
     if not CF_HTML:
         raise RuntimeError("Failed to register CF_HTML clipboard format")
 
@@ -453,88 +669,80 @@ def _set_clipboard_html_ctypes(html, plain_text, chromium_custom_data=None):
     html_payload = _build_cf_html(html).encode('utf-8')
     text_payload = plain_text.encode('utf-16-le')
 
-    if not user32.OpenClipboard(0):
+    if not _user32.OpenClipboard(0):
         raise RuntimeError("Could not open clipboard")
 
     try:
-        user32.EmptyClipboard()
+        _user32.EmptyClipboard()
 
         # Set CF_HTML (for Confluence and other HTML-aware apps)
-        hHtml = _alloc_clipboard_data(kernel32, html_payload)
-        if not user32.SetClipboardData(CF_HTML, hHtml):
+        hHtml = _alloc_clipboard_data(html_payload)
+        if not _user32.SetClipboardData(CF_HTML, hHtml):
             raise RuntimeError("SetClipboardData CF_HTML failed")
 
         # Set CF_UNICODETEXT (for plain-text-only apps)
-        hText = _alloc_clipboard_data(kernel32, text_payload)
-        if not user32.SetClipboardData(CF_UNICODETEXT, hText):
+        hText = _alloc_clipboard_data(text_payload)
+        if not _user32.SetClipboardData(CF_UNICODETEXT, hText):
             raise RuntimeError("SetClipboardData CF_UNICODETEXT failed")
 
-        # Optionally set Chromium Web Custom MIME Data Format
-        if chromium_custom_data is not None:
-            CF_CHROMIUM = user32.RegisterClipboardFormatW(
-                "Chromium Web Custom MIME Data Format"
-            )
-            if CF_CHROMIUM:
-                hChromium = _alloc_clipboard_data(kernel32, chromium_custom_data)
-                if not user32.SetClipboardData(CF_CHROMIUM, hChromium):
-                    print("[Tab Note Converter] Warning: SetClipboardData Chromium custom MIME failed")
+        # Optionally set Chromium Web Custom MIME Data Format. The payload
+        # is built lazily, only once the clipboard session is actually ours,
+        # so failure paths never pay for the UTF-16 pickle encoding.
+        if chromium_data_fn is not None and CF_CHROMIUM:
+            hChromium = _alloc_clipboard_data(chromium_data_fn())
+            if not _user32.SetClipboardData(CF_CHROMIUM, hChromium):
+                print("[Tab Note Converter] Warning: SetClipboardData Chromium custom MIME failed")
     finally:
-        user32.CloseClipboard()
+        _user32.CloseClipboard()
 
 
-def _set_clipboard_html_powershell(html, plain_text, chromium_custom_data=None):
+def _set_clipboard_html_powershell(html, plain_text, chromium_data_fn=None):
     """Fallback: use PowerShell + .NET to set CF_HTML and plain text.
 
+    The CF_HTML payload is piped through stdin — no temp file, no disk
+    round trip, and nothing left behind if PowerShell dies mid-way.
+
     NOTE: Chromium custom MIME data is not supported via PowerShell fallback.
     This means Slack nested lists won't work if ctypes fails.
     """
     import subprocess
-    import tempfile
-    import os
 
     payload = _build_cf_html(html)
 
-    # Write CF_HTML payload as raw bytes to a temp file
-    tmp_path = os.path.join(tempfile.gettempdir(), '_copyas_clipboard.bin')
-    with open(tmp_path, 'wb') as f:
-        f.write(payload.encode('utf-8'))
-
-    # Escape backslashes for PowerShell string interpolation
-    ps_path = tmp_path.replace('\\', '\\\\')
     # Escape single quotes in plain text for PowerShell
     ps_text = plain_text.replace("'", "''")
 
     ps_script = (
         'Add-Type -AssemblyName System.Windows.Forms; '
-        '$bytes = [System.IO.File]::ReadAllBytes("{}"); '
-        '$stream = New-Object System.IO.MemoryStream(,$bytes); '
+        '$stream = New-Object System.IO.MemoryStream; '
+        '[Console]::OpenStandardInput().CopyTo($stream); '
+        '$stream.Position = 0; '
         '$dataObj = New-Object System.Windows.Forms.DataObject; '
         '$dataObj.SetData("HTML Format", $stream); '
         "$dataObj.SetData([System.Windows.Forms.DataFormats]::UnicodeText, '{}'); "
         '[System.Windows.Forms.Clipboard]::SetDataObject($dataObj, $true)'
-    ).format(ps_path, ps_text)
-
-    try:
-        result = subprocess.run(
-            ['powershell', '-NoProfile', '-NonInteractive', '-Command', ps_script],
-            capture_output=True,
-            timeout=5,
-            # CREATE_NO_WINDOW = 0x08000000 — prevents a console flash
-            creationflags=0x08000000
-        )
-        if result.returncode != 0:
-            stderr = result.stderr.decode('utf-8', errors='replace')
-            raise RuntimeError("PowerShell clipboard failed: {}".format(stderr))
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+    ).format(ps_text)
+
+    result = subprocess.run(
+        ['powershell', '-NoProfile', '-NonInteractive', '-Command', ps_script],
+        input=payload.encode('utf-8'),
+        capture_output=True,
+        timeout=5,
+        # CREATE_NO_WINDOW = 0x08000000 — prevents a console flash
+        creationflags=0x08000000
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode('utf-8', errors='replace')
+        raise RuntimeError("PowerShell clipboard failed: {}".format(stderr))
 
 
-def set_clipboard_html(html, plain_text, chromium_custom_data=None):
+def set_clipboard_html(html, plain_text, chromium_data_fn=None):
     """Copy HTML + plain text to clipboard as rich text.
 
+    chromium_data_fn, if given, is a zero-argument callable returning the
+    Chromium custom MIME payload bytes; it is only invoked once a
+    clipboard session is open.
+
     Strategy: ctypes (fast) → PowerShell fallback → raw HTML as plain text.
     """
     if sys.platform != 'win32':
@@ -544,14 +752,14 @@ def set_clipboard_html(html, plain_text, chromium_custom_data=None):
 
     # Try ctypes first (fast, no subprocess overhead)
     try:
-        _set_clipboard_html_ctypes(html, plain_text, chromium_custom_data)
+        _set_clipboard_html_ctypes(html, plain_text, chromium_data_fn)
         return True
     except Exception as e:
         print("[Tab Note Converter] ctypes clipboard failed ({}), trying PowerShell...".format(e))
 
     # Fallback: PowerShell + .NET (no Chromium custom MIME support)
     try:
-        _set_clipboard_html_powershell(html, plain_text, chromium_custom_data)
+        _set_clipboard_html_powershell(html, plain_text, chromium_data_fn)
         return True
     except Exception as e:
         print("[Tab Note Converter] PowerShell clipboard also failed: {}".format(e))
@@ -583,12 +791,34 @@ def _normalize_output(text):
 # Commands
 # ---------------------------------------------------------------------------
 
+# Setting the clipboard — especially the Win32 multi-format session — is by
+# far the most expensive step, and redundant when the command runs twice on
+# unchanged content. CF_HTML can't cheaply be read back for comparison, so
+# remember what the rich-text paths last wrote and trust it only while the
+# plain-text slot still matches; any other app touching the clipboard
+# replaces CF_UNICODETEXT along with the rest.
+_last_rich_set = None  # (hash of html payload, plain text)
+
+
+def _rich_clipboard_is_current(html, plain_text):
+    return (_last_rich_set == (hash(html), plain_text)
+            and sublime.get_clipboard() == plain_text)
+
+
+def _remember_rich_set(html, plain_text):
+    global _last_rich_set
+    _last_rich_set = (hash(html), plain_text)
+
+
 class ConvertTabNoteToMarkdownCommand(sublime_plugin.TextCommand):
     """Convert raw notes to Markdown and copy to clipboard."""
 
     def run(self, edit):
         content = _get_content(self.view)
         markdown = _normalize_output(raw_to_markdown(content))
+        if sublime.get_clipboard() == markdown:
+            sublime.status_message("Markdown already on clipboard")
+            return
         sublime.set_clipboard(markdown)
         sublime.status_message("Converted to Markdown")
 
@@ -610,13 +840,20 @@ class ConvertTabNoteToSlackMessageCommand(sublime_plugin.TextCommand):
         slack_html = raw_to_slack_html(content)
         markdown = _normalize_output(raw_to_markdown(content))
 
-        # Build Chromium custom MIME payload with slack/html
-        chromium_data = _build_chromium_custom_mime([
-            ('slack/html', slack_html),
-        ])
+        if _rich_clipboard_is_current(slack_html, markdown):
+            sublime.status_message("Slack message already on clipboard")
+            return
+
+        # Chromium custom MIME payload with slack/html — built lazily, only
+        # once a clipboard session is actually open
+        def chromium_data():
+            return _build_chromium_custom_mime([
+                ('slack/html', slack_html),
+            ])
 
         success = set_clipboard_html(slack_html, markdown, chromium_data)
         if success:
+            _remember_rich_set(slack_html, markdown)
             sublime.status_message("Converted for Slack")
 
     def is_enabled(self):
@@ -628,11 +865,16 @@ class ConvertTabNoteToRichtextCommand(sublime_plugin.TextCommand):
 
     def run(self, edit):
         content = _get_content(self.view)
-        markdown = raw_to_markdown(content)
-        html = markdown_to_html(markdown)
-        plain_text = _normalize_output(markdown)
+        html = raw_to_html(content)
+        plain_text = _normalize_output(raw_to_markdown(content))
+
+        if _rich_clipboard_is_current(html, plain_text):
+            sublime.status_message("Rich text already on clipboard")
+            return
+
         success = set_clipboard_html(html, plain_text)
         if success:
+            _remember_rich_set(html, plain_text)
             sublime.status_message("Converted to Rich Text")
 
     def is_enabled(self):
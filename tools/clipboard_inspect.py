@@ -21,6 +21,16 @@ kernel32.GlobalSize.argtypes = [ctypes.c_void_p]
 user32.GetClipboardData.restype = ctypes.c_void_p
 user32.GetClipboardData.argtypes = [wintypes.UINT]
 
+# Bind the hot entry points once — every `user32.X` access goes through
+# attribute lookup and these run once per clipboard format in the
+# enumeration loop below.
+_EnumClipboardFormats = user32.EnumClipboardFormats
+_GetClipboardFormatNameW = user32.GetClipboardFormatNameW
+_GetClipboardData = user32.GetClipboardData
+_GlobalSize = kernel32.GlobalSize
+_GlobalLock = kernel32.GlobalLock
+_GlobalUnlock = kernel32.GlobalUnlock
+
 # Standard format names
 STANDARD_FORMATS = {
     1: "CF_TEXT", 2: "CF_BITMAP", 3: "CF_METAFILEPICT",
@@ -36,24 +46,24 @@ def get_format_name(fmt):
     if fmt in STANDARD_FORMATS:
         return STANDARD_FORMATS[fmt]
     buf = ctypes.create_unicode_buffer(256)
-    if user32.GetClipboardFormatNameW(fmt, buf, 256):
+    if _GetClipboardFormatNameW(fmt, buf, 256):
         return buf.value
     return "Unknown({})".format(fmt)
 
 
 def get_clipboard_data(fmt):
-    hMem = user32.GetClipboardData(fmt)
+    hMem = _GetClipboardData(fmt)
     if not hMem:
         return None
-    size = kernel32.GlobalSize(hMem)
-    pMem = kernel32.GlobalLock(hMem)
+    size = _GlobalSize(hMem)
+    pMem = _GlobalLock(hMem)
     if not pMem:
         return None
     try:
         data = ctypes.string_at(pMem, size)
         return data
     finally:
-        kernel32.GlobalUnlock(hMem)
+        _GlobalUnlock(hMem)
 
 
 def main():
@@ -66,7 +76,7 @@ def main():
         fmt = 0
         formats = []
         while True:
-            fmt = user32.EnumClipboardFormats(fmt)
+            fmt = _EnumClipboardFormats(fmt)
             if fmt == 0:
                 break
             formats.append(fmt)
@@ -6,9 +6,14 @@ Usage:
     3. Send me the output (or pipe to file: python clipboard_inspect_v2.py > dump.txt)
 """
 
+import argparse
 import ctypes
+import hashlib
+from contextlib import contextmanager
 from ctypes import wintypes
 import struct
+import sys
+from codecs import getincrementaldecoder, utf_16_le_decode
 
 user32 = ctypes.windll.user32
 kernel32 = ctypes.windll.kernel32
@@ -20,103 +25,221 @@ kernel32.GlobalSize.restype = ctypes.c_size_t
 kernel32.GlobalSize.argtypes = [ctypes.c_void_p]
 user32.GetClipboardData.restype = ctypes.c_void_p
 user32.GetClipboardData.argtypes = [wintypes.UINT]
-
-
-def get_clipboard_data(fmt):
-    hMem = user32.GetClipboardData(fmt)
-    if not hMem:
-        return None
-    size = kernel32.GlobalSize(hMem)
-    pMem = kernel32.GlobalLock(hMem)
-    if not pMem:
-        return None
+user32.RegisterClipboardFormatW.restype = wintypes.UINT
+user32.RegisterClipboardFormatW.argtypes = [wintypes.LPCWSTR]
+user32.IsClipboardFormatAvailable.restype = wintypes.BOOL
+user32.IsClipboardFormatAvailable.argtypes = [wintypes.UINT]
+
+# Content fields bigger than this stream to stdout in chunks instead of
+# being decoded into one giant str (see decode_chromium_pickle).
+_STREAM_CHUNK = 65536
+
+# Compiled once — struct.unpack_from('<I', ...) re-parses the format
+# string on every call, and this runs twice per entry.
+_u32_from = struct.Struct('<I').unpack_from
+# The two header words are adjacent, so one paired read replaces two.
+_u32x2_from = struct.Struct('<II').unpack_from
+
+
+def _decode_utf16le_fast(b):
+    """Decode UTF-16LE, skipping the codec for pure-ASCII strings.
+
+    MIME types in this format are always ASCII ('text/html', 'slack/html',
+    ...) stored as UTF-16LE, so every odd byte is zero. The any() scan over
+    the strided view runs at C level and the even bytes then decode as
+    latin-1, a straight byte-to-codepoint copy.
+    """
+    if not any(b[1::2]):
+        return bytes(b[0::2]).decode('latin-1')
+    return utf_16_le_decode(b)[0]
+
+
+@contextmanager
+def clipboard_locked(fmt):
+    """Yield a memoryview over the locked clipboard block for `fmt`.
+
+    The memoryview aliases the global memory directly — no string_at copy
+    of the whole blob. A single OpenClipboard/GlobalLock pair covers the
+    whole with-block and both are released on exit; yields None if the
+    clipboard could not be opened or the data not locked.
+    """
+    if not user32.OpenClipboard(0):
+        yield None
+        return
     try:
-        return ctypes.string_at(pMem, size)
+        hMem = user32.GetClipboardData(fmt)
+        pMem = kernel32.GlobalLock(hMem) if hMem else None
+        if not pMem:
+            yield None
+            return
+        try:
+            size = kernel32.GlobalSize(hMem)
+            yield memoryview((ctypes.c_ubyte * size).from_address(pMem))
+        finally:
+            kernel32.GlobalUnlock(hMem)
     finally:
-        kernel32.GlobalUnlock(hMem)
-
-
-def decode_chromium_pickle(data):
-    """Decode Chromium's Pickle-serialized custom MIME data."""
-    offset = 0
-
-    # Header: uint32 payload_size
-    payload_size = struct.unpack_from('<I', data, offset)[0]
-    offset += 4
-    print("  Payload size: {} bytes".format(payload_size))
+        user32.CloseClipboard()
 
-    # uint32 num_entries
-    num_entries = struct.unpack_from('<I', data, offset)[0]
-    offset += 4
-    print("  Number of entries: {}".format(num_entries))
 
-    for i in range(num_entries):
-        # Read MIME type string (UTF-16LE)
-        char_count = struct.unpack_from('<I', data, offset)[0]
-        offset += 4
-        mime_bytes = data[offset:offset + char_count * 2]
-        mime = mime_bytes.decode('utf-16-le')
-        offset += char_count * 2
-        # Alignment padding
-        if (char_count * 2) % 4:
-            offset += 4 - (char_count * 2) % 4
-
-        # Read content string (UTF-16LE)
-        char_count2 = struct.unpack_from('<I', data, offset)[0]
+def decode_chromium_pickle(data, max_chars=None, digest=False):
+    """Decode Chromium's Pickle-serialized custom MIME data.
+
+    `max_chars` caps how much of each content string is decoded. Slack's
+    text/html entry can run to megabytes of UTF-16; when only the MIME
+    types and sizes matter there is no point paying for the full decode,
+    so the slice is truncated *before* the codec runs. `digest` replaces
+    the content entirely with a SHA-1 of its raw bytes — hashing runs at
+    near-memcpy speed while dumping megabytes of text is bound by the
+    terminal, and a fingerprint is what comparing two dumps needs anyway.
+    """
+    # memoryview: all slicing below is zero-copy instead of allocating a
+    # fresh bytes object per field.
+    buf = memoryview(data)
+
+    # Buffer all output and emit it with a single write at the end —
+    # one syscall instead of several line-buffered prints per entry,
+    # which dominates for dumps with hundreds of entries.
+    out = []
+
+    size = len(buf)
+
+    # Header: uint32 payload_size, uint32 num_entries
+    payload_size, num_entries = _u32x2_from(buf, 0)
+    out.append(f"  Payload size: {payload_size} bytes")
+    out.append(f"  Number of entries: {num_entries}")
+
+    # The header is untrusted — the clipboard block comes from whatever
+    # app wrote it. A bogus num_entries (each entry needs at least two
+    # uint32 length fields) or a payload_size past the end of the block
+    # would send the loop below through garbage offsets, so reject it
+    # before doing any per-entry work. payload_size covers everything
+    # after its own field, num_entries word included.
+    if payload_size > size - 4 or num_entries * 8 > payload_size - 4:
+        out.append("  ERROR: header inconsistent with block size — "
+                   "truncated or corrupt payload, aborting.")
+        sys.stdout.write('\n'.join(out) + '\n')
+        return 8
+
+    # Pass 1: walk only the length fields and collect (offset, byte_len)
+    # for every string (MIME type and content alternating), keeping the
+    # offset bookkeeping in one tight loop with no decoding mixed in.
+    spans = []
+    offset = 8
+    for _ in range(num_entries * 2):
+        if offset + 4 > size:
+            out.append(f"  ERROR: length field at offset {offset} runs past "
+                       "end of block — truncated or corrupt payload, "
+                       "aborting.")
+            sys.stdout.write('\n'.join(out) + '\n')
+            return offset
+        char_count = _u32_from(buf, offset)[0]
         offset += 4
-        content_bytes = data[offset:offset + char_count2 * 2]
-        content = content_bytes.decode('utf-16-le')
-        offset += char_count2 * 2
-        if (char_count2 * 2) % 4:
-            offset += 4 - (char_count2 * 2) % 4
-
-        print("\n  --- Entry {} ---".format(i))
-        print("  MIME type: '{}'".format(mime))
-        print("  Content length: {} chars".format(len(content)))
-        print("  Content:")
-        print(content)
-
+        byte_len = char_count * 2
+        if offset + byte_len > size:
+            out.append(f"  ERROR: string at offset {offset - 4} runs past "
+                       "end of block — truncated or corrupt payload, "
+                       "aborting.")
+            sys.stdout.write('\n'.join(out) + '\n')
+            return offset
+        spans.append((offset, byte_len))
+        # Advance past the string and its alignment padding: branchless
+        # round-up to the next 4-byte boundary, instead of two modulos
+        # and a branch per string
+        offset = (offset + byte_len + 3) & ~3
+
+    # Pass 2: decode and print, entry by entry
+    for i in range(num_entries):
+        mime_off, mime_len = spans[2 * i]
+        content_off, content_len = spans[2 * i + 1]
+        # utf_16_le_decode accepts the buffer protocol directly — no bytes
+        # copy, and no per-call codec lookup through str.decode.
+        mime = _decode_utf16le_fast(buf[mime_off:mime_off + mime_len])
+
+        out.append(f"\n  --- Entry {i} ---")
+        out.append(f"  MIME type: '{mime}'")
+        out.append(f"  Content length: {content_len // 2} chars")
+
+        if digest:
+            # sha1() takes the memoryview via the buffer protocol; no
+            # decode, no copy.
+            sha1 = hashlib.sha1(buf[content_off:content_off + content_len])
+            out.append(f"  sha1: {sha1.hexdigest()}")
+            continue
+
+        if max_chars is not None and max_chars * 2 < content_len:
+            # Truncating mid-stream can split a surrogate pair, hence
+            # errors='replace' on this path.
+            content = bytes(
+                buf[content_off:content_off + max_chars * 2]
+            ).decode('utf-16-le', errors='replace')
+            out.append(f"  Content (first {max_chars} chars):")
+        else:
+            out.append("  Content:")
+            if content_len > _STREAM_CHUNK:
+                # Decoding a multi-megabyte field into one str keeps the
+                # whole text in memory on top of the locked clipboard
+                # block. Flush what is buffered, then decode and write in
+                # 64 KiB slices — the incremental decoder carries split
+                # surrogate pairs across chunk boundaries, and peak
+                # memory stays O(chunk) instead of O(payload).
+                sys.stdout.write('\n'.join(out) + '\n')
+                out = ['']
+                decode = getincrementaldecoder('utf-16-le')().decode
+                write = sys.stdout.write
+                stop = content_off + content_len
+                for j in range(content_off, stop, _STREAM_CHUNK):
+                    write(decode(buf[j:min(j + _STREAM_CHUNK, stop)]))
+                write(decode(b'', True))
+                continue
+            content = utf_16_le_decode(
+                buf[content_off:content_off + content_len]
+            )[0]
+        out.append(content)
+
+    sys.stdout.write('\n'.join(out) + '\n')
     return offset
 
 
 def main():
-    if not user32.OpenClipboard(0):
-        print("ERROR: Could not open clipboard")
+    parser = argparse.ArgumentParser(
+        description="Decode the Chromium Web Custom MIME Data clipboard format."
+    )
+    parser.add_argument(
+        '--max-content-chars', type=int, default=None, metavar='N',
+        help="only decode and print the first N chars of each entry's content"
+    )
+    parser.add_argument(
+        '--digest', action='store_true',
+        help="print a SHA-1 of each entry's raw content instead of the text"
+    )
+    args = parser.parse_args()
+
+    # The format name is fixed, so ask the atom table for its ID directly
+    # instead of enumerating every clipboard format and string-comparing
+    # the names (RegisterClipboardFormatW returns the existing atom for an
+    # already-registered name). Both calls work without holding the
+    # clipboard, so the common "nothing from Slack on the clipboard" case
+    # exits before OpenClipboard — which would block other apps for the
+    # duration.
+    target_fmt = user32.RegisterClipboardFormatW(
+        "Chromium Web Custom MIME Data Format"
+    )
+    if not target_fmt or not user32.IsClipboardFormatAvailable(target_fmt):
+        print("No 'Chromium Web Custom MIME Data Format' found on clipboard.")
+        print("Make sure you copied from Slack first.")
         return
 
-    try:
-        # Find Chromium Web Custom MIME Data Format
-        fmt = 0
-        target_fmt = None
-        while True:
-            fmt = user32.EnumClipboardFormats(fmt)
-            if fmt == 0:
-                break
-            buf = ctypes.create_unicode_buffer(256)
-            if user32.GetClipboardFormatNameW(fmt, buf, 256):
-                if buf.value == "Chromium Web Custom MIME Data Format":
-                    target_fmt = fmt
-                    break
-
-        if target_fmt is None:
-            print("No 'Chromium Web Custom MIME Data Format' found on clipboard.")
-            print("Make sure you copied from Slack first.")
-            return
-
-        print("=" * 70)
-        print("CHROMIUM WEB CUSTOM MIME DATA FORMAT (id={})".format(target_fmt))
-        print("=" * 70)
+    print("=" * 70)
+    print(f"CHROMIUM WEB CUSTOM MIME DATA FORMAT (id={target_fmt})")
+    print("=" * 70)
 
-        data = get_clipboard_data(target_fmt)
-        if data is None:
+    with clipboard_locked(target_fmt) as view:
+        if view is None:
             print("Could not read clipboard data.")
             return
-
-        print("  Total size: {} bytes".format(len(data)))
-        decode_chromium_pickle(data)
-
-    finally:
-        user32.CloseClipboard()
+        print(f"  Total size: {len(view)} bytes")
+        decode_chromium_pickle(view, max_chars=args.max_content_chars,
+                               digest=args.digest)
 
 
 if __name__ == '__main__':